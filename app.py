@@ -1,15 +1,26 @@
 """
-Flask REST API for Flow Manager microservice.
+Quart REST API for Flow Manager microservice.
 Provides endpoints for flow execution, status checking, and validation.
+
+Quart keeps Flask's API but serves requests natively over ASGI, so
+concurrent flow executions interleave on the worker's event loop.
 """
 
-from flask import Flask, request, jsonify
-from typing import Dict, Any
+from quart import Quart, Response, request
+from typing import Dict, Any, Iterator, List, Optional
+from collections import OrderedDict
+import hashlib
 import logging
+import os
+import threading
+
+import orjson
 
 from flow_engine import FlowParser, FlowOrchestrator
-from models import FlowStatus
-import sample_tasks  # Import to register tasks
+from models import Flow, FlowStatus, FlowExecutionState
+from serialization import dumps
+from state_store import InMemoryStateStore, RedisStateStore
+from task_executor import register_builtin_tasks
 
 # Configure logging
 logging.basicConfig(
@@ -18,25 +29,129 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config['JSON_SORT_KEYS'] = False
+# Initialize Quart app
+app = Quart(__name__)
+
+
+def _create_state_store():
+    """Select the execution state store from FLOW_STATE_STORE (memory|redis)"""
+    backend = os.environ.get("FLOW_STATE_STORE", "memory").lower()
+    if backend == "redis":
+        return RedisStateStore(
+            url=os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+            ttl=int(os.environ.get("FLOW_STATE_TTL", "3600"))
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown FLOW_STATE_STORE '{backend}', expected 'memory' or 'redis'")
+    return InMemoryStateStore()
+
 
 # Global orchestrator instance
-orchestrator = FlowOrchestrator()
+orchestrator = FlowOrchestrator(store=_create_state_store())
+
+
+def _json(obj: Any, code: int = 200) -> Response:
+    """Build a JSON response using orjson"""
+    return Response(
+        dumps(obj),
+        status=code,
+        mimetype="application/json"
+    )
+
+
+# Parsed flows keyed by a hash of the raw request body. Flow objects are
+# never mutated after parsing, so they can be shared between requests.
+_FLOW_CACHE_SIZE = 128
+_flow_cache: "OrderedDict[bytes, Flow]" = OrderedDict()
+_flow_cache_lock = threading.Lock()
+
+
+def _parse_flow(raw: bytes) -> Optional[Flow]:
+    """
+    Parse a raw flow definition, reusing the result for repeated bodies.
+    
+    Returns None if the body holds no JSON data. Raises ValueError if the
+    flow definition is invalid.
+    """
+    key = hashlib.blake2b(raw, digest_size=16).digest()
+    
+    with _flow_cache_lock:
+        flow = _flow_cache.get(key)
+        if flow is not None:
+            _flow_cache.move_to_end(key)
+            return flow
+    
+    flow_json = orjson.loads(raw) if raw else None
+    if not flow_json:
+        return None
+    
+    flow = FlowParser.parse(flow_json)
+    
+    with _flow_cache_lock:
+        _flow_cache[key] = flow
+        if len(_flow_cache) > _FLOW_CACHE_SIZE:
+            _flow_cache.popitem(last=False)
+    
+    return flow
+
+
+def _iter_state(envelope: Dict[str, Any], rows: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Encode an execution state as JSON chunks.
+    
+    History entries are encoded one at a time so the whole document is
+    never materialized in memory and the envelope reaches the client first.
+    """
+    yield b'{"execution_id":'
+    yield orjson.dumps(envelope["execution_id"])
+    yield b',"flow_id":'
+    yield orjson.dumps(envelope["flow_id"])
+    yield b',"status":'
+    yield orjson.dumps(envelope["status"])
+    yield b',"current_task":'
+    yield orjson.dumps(envelope["current_task"])
+    yield b',"execution_history":['
+    first = True
+    for row in rows:
+        if not first:
+            yield b','
+        first = False
+        yield dumps(row)
+    yield b'],"start_time":'
+    yield orjson.dumps(envelope["start_time"])
+    yield b',"end_time":'
+    yield orjson.dumps(envelope["end_time"])
+    yield b',"error_message":'
+    yield orjson.dumps(envelope["error_message"])
+    yield b'}'
+
+
+def _stream_state(state: FlowExecutionState, code: int = 200) -> Response:
+    """
+    Build a streaming JSON response for an execution state.
+    
+    The body is streamed after the view returns, while a running flow may
+    still be updating the state, so the fields and the rows recorded so far
+    are captured here to keep the document consistent.
+    """
+    return Response(
+        _iter_state(state.envelope(), list(state.history_rows)),
+        status=code,
+        mimetype="application/json"
+    )
 
 
 @app.route('/health', methods=['GET'])
-def health_check():
+async def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return _json({
         "status": "healthy",
         "service": "Flow Manager"
-    }), 200
+    }, 200)
 
 
 @app.route('/flow/execute', methods=['POST'])
-def execute_flow():
+async def execute_flow():
     """
     Execute a flow from JSON definition.
     
@@ -47,45 +162,41 @@ def execute_flow():
         Execution state with results
     """
     try:
-        flow_json = request.get_json()
-        
-        if not flow_json:
-            return jsonify({
-                "error": "No JSON data provided"
-            }), 400
-        
         # Parse flow
         logger.info("Parsing flow definition...")
-        flow = FlowParser.parse(flow_json)
+        flow = _parse_flow(await request.get_data())
+        
+        if flow is None:
+            return _json({
+                "error": "No JSON data provided"
+            }, 400)
         
         # Execute flow
-        logger.info(f"Executing flow: {flow.name} (ID: {flow.id})")
-        execution_state = orchestrator.execute_flow(flow)
+        logger.info("Executing flow: %s (ID: %s)", flow.name, flow.id)
+        execution_state = await orchestrator.execute_flow(flow)
         
         # Return execution results
-        result = execution_state.to_dict()
-        
         status_code = 200 if execution_state.status == FlowStatus.COMPLETED else 500
         
-        return jsonify(result), status_code
+        return _stream_state(execution_state, status_code)
         
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
-        return jsonify({
+        logger.error("Validation error: %s", e)
+        return _json({
             "error": "Invalid flow definition",
             "details": str(e)
-        }), 400
+        }, 400)
         
     except Exception as e:
-        logger.error(f"Error executing flow: {str(e)}")
-        return jsonify({
+        logger.error("Error executing flow: %s", e)
+        return _json({
             "error": "Internal server error",
             "details": str(e)
-        }), 500
+        }, 500)
 
 
 @app.route('/flow/status/<execution_id>', methods=['GET'])
-def get_flow_status(execution_id: str):
+async def get_flow_status(execution_id: str):
     """
     Get the status of a flow execution.
     
@@ -96,25 +207,25 @@ def get_flow_status(execution_id: str):
         Execution state
     """
     try:
-        state = orchestrator.get_execution_state(execution_id)
+        state = await orchestrator.get_execution_state(execution_id)
         
         if not state:
-            return jsonify({
+            return _json({
                 "error": f"Execution ID '{execution_id}' not found"
-            }), 404
+            }, 404)
         
-        return jsonify(state.to_dict()), 200
+        return _stream_state(state, 200)
         
     except Exception as e:
-        logger.error(f"Error getting flow status: {str(e)}")
-        return jsonify({
+        logger.error("Error getting flow status: %s", e)
+        return _json({
             "error": "Internal server error",
             "details": str(e)
-        }), 500
+        }, 500)
 
 
 @app.route('/flow/validate', methods=['POST'])
-def validate_flow():
+async def validate_flow():
     """
     Validate a flow JSON definition without executing it.
     
@@ -125,60 +236,63 @@ def validate_flow():
         Validation result
     """
     try:
-        flow_json = request.get_json()
+        # Parse and validate flow
+        flow = _parse_flow(await request.get_data())
         
-        if not flow_json:
-            return jsonify({
+        if flow is None:
+            return _json({
                 "error": "No JSON data provided"
-            }), 400
-        
-        # Parse and validate flow
-        flow = FlowParser.parse(flow_json)
+            }, 400)
         
-        return jsonify({
+        return _json({
             "valid": True,
-            "flow": flow.to_dict(),
+            "flow": flow,
             "message": "Flow definition is valid"
-        }), 200
+        }, 200)
         
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
-        return jsonify({
+        logger.error("Validation error: %s", e)
+        return _json({
             "valid": False,
             "error": str(e)
-        }), 400
+        }, 400)
         
     except Exception as e:
-        logger.error(f"Error validating flow: {str(e)}")
-        return jsonify({
+        logger.error("Error validating flow: %s", e)
+        return _json({
             "valid": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 
 @app.errorhandler(404)
-def not_found(error):
+async def not_found(error):
     """Handle 404 errors"""
-    return jsonify({
+    return _json({
         "error": "Endpoint not found"
-    }), 404
+    }, 404)
 
 
 @app.errorhandler(500)
-def internal_error(error):
+async def internal_error(error):
     """Handle 500 errors"""
-    return jsonify({
+    return _json({
         "error": "Internal server error"
-    }), 500
+    }, 500)
 
 
 if __name__ == '__main__':
+    import uvicorn
+    
     logger.info("Starting Flow Manager microservice...")
+    register_builtin_tasks()
     logger.info("Available endpoints:")
     logger.info("  GET  /health")
     logger.info("  POST /flow/execute")
     logger.info("  GET  /flow/status/<execution_id>")
     logger.info("  POST /flow/validate")
     
-    # Run Flask app
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # The Quart app is itself the ASGI application:
+    #   uvicorn app:app --workers $(nproc) --loop uvloop
+    # (multiple workers require FLOW_STATE_STORE=redis)
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -3,30 +3,78 @@ Core Flow Engine for managing flow execution.
 Includes FlowParser, ConditionEvaluator, and FlowOrchestrator.
 """
 
+import sys
 import uuid
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+import fastjsonschema
+
 from models import (
     Flow, Task, Condition, FlowExecutionState, TaskExecutionResult,
-    FlowStatus, TaskStatus
+    FlowStatus, TaskStatus, JoinGraph
 )
-from task_executor import task_registry
+from task_executor import get_executor
+from state_store import StateStore, InMemoryStateStore
 
 logger = logging.getLogger(__name__)
 
+# JSON Schema for a flow definition (the object inside the optional "flow" key).
+# Optional fields carry defaults, which the compiled validator fills in.
+FLOW_SCHEMA = {
+    "type": "object",
+    "required": ["id", "name", "start_task", "tasks"],
+    "properties": {
+        "id": {"type": "string", "minLength": 1},
+        "name": {"type": "string", "minLength": 1},
+        "start_task": {"type": "string", "minLength": 1},
+        "fan_out": {"type": "boolean", "default": False},
+        "tasks": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {
+                    "name": {"type": "string"},
+                    "description": {"type": "string", "default": ""}
+                }
+            }
+        },
+        "conditions": {
+            "type": "array",
+            "default": [],
+            "items": {
+                "type": "object",
+                "required": ["name", "source_task", "target_task_success", "target_task_failure"],
+                "properties": {
+                    "name": {"type": "string"},
+                    "description": {"type": "string", "default": ""},
+                    "source_task": {"type": "string"},
+                    "outcome": {"enum": ["success", "failure"], "default": "success"},
+                    "target_task_success": {"type": "string"},
+                    "target_task_failure": {"type": "string"}
+                }
+            }
+        }
+    }
+}
+
+_validate_flow_schema = fastjsonschema.compile(FLOW_SCHEMA)
+
 
 class FlowParser:
     """Parses JSON flow definitions into Flow objects"""
     
     @staticmethod
-    def parse(flow_json: Dict[str, Any]) -> Flow:
+    def parse(flow_json: Any) -> Flow:
         """
         Parse a JSON flow definition into a Flow object.
         
         Args:
-            flow_json: Dictionary containing flow definition
+            flow_json: Decoded JSON document; anything but an object is rejected
             
         Returns:
             Flow object
@@ -35,49 +83,43 @@ class FlowParser:
             ValueError: If flow JSON is invalid
         """
         try:
-            flow_data = flow_json.get("flow", flow_json)
+            if not isinstance(flow_json, dict):
+                raise ValueError("flow definition must be a JSON object")
             
-            # Extract required fields
-            flow_id = flow_data.get("id")
-            name = flow_data.get("name")
-            start_task = flow_data.get("start_task")
+            flow_data = flow_json.get("flow", flow_json)
             
-            if not all([flow_id, name, start_task]):
-                raise ValueError("Flow must have 'id', 'name', and 'start_task'")
+            # Check structure and fill in defaults for optional fields
+            _validate_flow_schema(flow_data)
             
-            # Parse tasks
-            tasks_data = flow_data.get("tasks", [])
+            # Task names are interned so the dict lookups made on every
+            # orchestration step can short-circuit on identity
             tasks = [
                 Task(
-                    name=task["name"],
-                    description=task.get("description", "")
+                    name=sys.intern(task["name"]),
+                    description=task["description"]
                 )
-                for task in tasks_data
+                for task in flow_data["tasks"]
             ]
             
-            if not tasks:
-                raise ValueError("Flow must have at least one task")
-            
-            # Parse conditions
-            conditions_data = flow_data.get("conditions", [])
             conditions = [
                 Condition(
                     name=cond["name"],
-                    description=cond.get("description", ""),
-                    source_task=cond["source_task"],
-                    outcome=cond.get("outcome", "success"),
-                    target_task_success=cond["target_task_success"],
-                    target_task_failure=cond["target_task_failure"]
+                    description=cond["description"],
+                    source_task=sys.intern(cond["source_task"]),
+                    outcome=cond["outcome"],
+                    target_task_success=sys.intern(cond["target_task_success"]),
+                    target_task_failure=sys.intern(cond["target_task_failure"])
                 )
-                for cond in conditions_data
+                for cond in flow_data["conditions"]
             ]
             
             flow = Flow(
-                id=flow_id,
-                name=name,
-                start_task=start_task,
+                id=flow_data["id"],
+                name=flow_data["name"],
+                start_task=sys.intern(flow_data["start_task"]),
                 tasks=tasks,
-                conditions=conditions
+                conditions=conditions,
+                fan_out=flow_data["fan_out"]
             )
             
             # Validate flow
@@ -91,7 +133,7 @@ class FlowParser:
             raise ValueError(f"Invalid flow definition: {str(e)}")
     
     @staticmethod
-    def validate_flow(flow: Flow):
+    def validate_flow(flow: Flow) -> None:
         """
         Validate that the flow is properly structured.
         
@@ -131,64 +173,127 @@ class ConditionEvaluator:
     @staticmethod
     def evaluate(
         task_result: TaskExecutionResult,
-        conditions: list[Condition]
+        flow: Flow
     ) -> Optional[str]:
         """
         Evaluate conditions for a task result and return the next task.
         
         Args:
             task_result: Result of the task execution
-            conditions: List of conditions to evaluate
+            flow: Flow whose conditions are evaluated
             
         Returns:
             Name of the next task to execute, or "end" to end the flow
         """
-        # Find conditions for this task
-        task_conditions = [
-            c for c in conditions 
-            if c.source_task == task_result.task_name
-        ]
-        
-        if not task_conditions:
-            logger.warning(f"No conditions found for task '{task_result.task_name}', ending flow")
-            return "end"
+        next_tasks = ConditionEvaluator.evaluate_all(task_result, flow)
+        return next_tasks[0] if next_tasks else "end"
+    
+    @staticmethod
+    def evaluate_all(
+        task_result: TaskExecutionResult,
+        flow: Flow
+    ) -> Tuple[str, ...]:
+        """
+        Evaluate conditions for a task result and return every next task.
         
-        # Evaluate based on task status
-        for condition in task_conditions:
-            if task_result.status == TaskStatus.SUCCESS and condition.outcome == "success":
-                next_task = condition.target_task_success
-                logger.info(
-                    f"Condition '{condition.name}' matched (success): next task = '{next_task}'"
-                )
-                return next_task
+        Args:
+            task_result: Result of the task execution
+            flow: Flow whose conditions are evaluated
             
-            elif task_result.status == TaskStatus.FAILURE and condition.outcome == "failure":
-                next_task = condition.target_task_failure
-                logger.info(
-                    f"Condition '{condition.name}' matched (failure): next task = '{next_task}'"
-                )
-                return next_task
+        Returns:
+            Names of the tasks to execute next; empty if this branch ends
+        """
+        matches = flow.next_map.get((task_result.task_name, task_result.status.value))
         
-        # If task succeeded but condition expects success, route to success target
-        for condition in task_conditions:
-            if condition.outcome == "success":
-                if task_result.status == TaskStatus.SUCCESS:
-                    return condition.target_task_success
-                else:
-                    return condition.target_task_failure
+        if matches is None:
+            if not flow.get_conditions_for_task(task_result.task_name):
+                logger.warning("No conditions found for task '%s', ending flow", task_result.task_name)
+            else:
+                logger.warning("No matching condition for task '%s', ending flow", task_result.task_name)
+            return ()
         
-        # Default to end if no conditions match
-        logger.warning(f"No matching condition for task '{task_result.task_name}', ending flow")
-        return "end"
+        for condition_name, target in matches:
+            logger.info(
+                "Condition '%s' matched (%s): next task = '%s'",
+                condition_name, task_result.status.value, target
+            )
+        return tuple(target for _, target in matches if target != "end")
+
+
+class _JoinTracker:
+    """
+    Join bookkeeping for one execution of a fan-out flow.
+    
+    Each task counts the predecessors (outside its own loop) that could still
+    run. A component of the routing graph settles once nothing can route
+    into it any more and none of its tasks is pending or running; settling
+    releases its successors, and components that were never reached settle
+    straight away. A join therefore starts once, after every incoming branch
+    has either finished or been ruled out. Every route is visited a constant
+    number of times, so the cost is linear in the size of the flow.
+    """
+    
+    def __init__(self, joins: JoinGraph, start_task: str) -> None:
+        self._graph = joins
+        self._waiting = {name: len(names) for name, names in joins.predecessors.items()}
+        self._component_waiting = [0] * len(joins.members)
+        for name, count in self._waiting.items():
+            self._component_waiting[joins.component[name]] += count
+        self._component_live = [0] * len(joins.members)
+        self._component_live[joins.component[start_task]] = 1
+        self._settled = [False] * len(joins.members)
+        self._settle([c for c in range(len(joins.members)) if self._is_idle(c)])
+    
+    def is_ready(self, task_name: str) -> bool:
+        """Whether none of the task's predecessors can still run"""
+        return not self._waiting.get(task_name, 0)
+    
+    def route(self, pending: Dict[str, None], task_names: Tuple[str, ...]) -> None:
+        """Add routed-to tasks to the pending set"""
+        for task_name in task_names:
+            if task_name not in pending:
+                pending[task_name] = None
+                self._component_live[self._graph.component[task_name]] += 1
+    
+    def finish(self, task_name: str) -> None:
+        """Record that a started task has finished (after routing its results)"""
+        component = self._graph.component[task_name]
+        self._component_live[component] -= 1
+        if self._is_idle(component):
+            self._settle([component])
+    
+    def _is_idle(self, component: int) -> bool:
+        """Whether an unsettled component can no longer be reached or run"""
+        return (
+            not self._settled[component]
+            and not self._component_waiting[component]
+            and not self._component_live[component]
+        )
+    
+    def _settle(self, components: List[int]) -> None:
+        """Settle idle components and, transitively, the ones they release"""
+        graph = self._graph
+        while components:
+            component = components.pop()
+            if self._settled[component]:
+                continue
+            self._settled[component] = True
+            for member in graph.members[component]:
+                for successor in graph.successors.get(member, ()):
+                    self._waiting[successor] -= 1
+                    target = graph.component[successor]
+                    self._component_waiting[target] -= 1
+                    if self._is_idle(target):
+                        components.append(target)
 
 
 class FlowOrchestrator:
     """Orchestrates the execution of a flow"""
     
-    def __init__(self):
-        self.executions: Dict[str, FlowExecutionState] = {}
+    def __init__(self, store: Optional[StateStore] = None) -> None:
+        self.store: StateStore = store if store is not None else InMemoryStateStore()
     
-    def execute_flow(self, flow: Flow) -> FlowExecutionState:
+    async def execute_flow(self, flow: Flow) -> FlowExecutionState:
         """
         Execute a complete flow.
         
@@ -207,61 +312,122 @@ class FlowOrchestrator:
             current_task=flow.start_task
         )
         
-        self.executions[execution_id] = state
+        await self._save_state(state)
         
-        logger.info(f"Starting flow execution: {execution_id} for flow: {flow.name}")
+        logger.info("Starting flow execution: %s for flow: %s", execution_id, flow.name)
         
         try:
-            current_task_name = flow.start_task
-            
-            while current_task_name != "end":
-                # Update current task
-                state.current_task = current_task_name
-                
-                # Get task definition
-                task = flow.get_task(current_task_name)
-                if not task:
-                    raise ValueError(f"Task '{current_task_name}' not found in flow")
-                
-                # Execute task
-                logger.info(f"Executing task: {current_task_name}")
-                task_result = self._execute_task(current_task_name, state)
-                
-                # Add result to execution history
-                state.add_task_result(task_result)
-                
-                # Evaluate conditions to determine next task
-                next_task_name = ConditionEvaluator.evaluate(
-                    task_result,
-                    flow.conditions
-                )
-                
-                logger.info(f"Next task: {next_task_name}")
-                
-                # If task failed and next is end, mark flow as failed
-                if task_result.status == TaskStatus.FAILURE and next_task_name == "end":
-                    state.status = FlowStatus.FAILED
-                    state.error_message = task_result.message
-                    break
-                
-                current_task_name = next_task_name
+            # Only fan-out flows carry join metadata
+            joins = flow.joins
+            if joins is not None:
+                await self._run_branches(flow, joins, state)
+            else:
+                await self._run_sequential(flow, state)
             
             # Flow completed successfully if we reached end without failure
             if state.status == FlowStatus.RUNNING:
                 state.status = FlowStatus.COMPLETED
             
             state.end_time = datetime.now()
-            logger.info(f"Flow execution completed: {execution_id} with status: {state.status.value}")
+            logger.info("Flow execution completed: %s with status: %s", execution_id, state.status.value)
             
         except Exception as e:
-            logger.error(f"Error during flow execution: {str(e)}")
+            logger.error("Error during flow execution: %s", e)
             state.status = FlowStatus.FAILED
             state.error_message = str(e)
             state.end_time = datetime.now()
         
+        await self._save_state(state)
         return state
     
-    def _execute_task(
+    async def _run_sequential(self, flow: Flow, state: FlowExecutionState) -> None:
+        """Run one task at a time, following the first matching condition"""
+        next_tasks: Tuple[str, ...] = (flow.start_task,)
+        
+        while next_tasks:
+            task_name = self._start_task(flow, state, next_tasks[0])
+            task_result = await self._execute_task(task_name, state)
+            next_tasks = self._record_result(flow, state, task_result)
+            
+            await self._save_state(state)
+            
+            if state.status == FlowStatus.FAILED:
+                break
+    
+    async def _run_branches(self, flow: Flow, graph: JoinGraph, state: FlowExecutionState) -> None:
+        """Run every routed-to task as a concurrent branch, joining where branches meet"""
+        joins = _JoinTracker(graph, flow.start_task)
+        
+        # Tasks that have been routed to but not started yet, in routing
+        # order, and the asyncio tasks currently executing
+        pending: Dict[str, None] = {flow.start_task: None}
+        running: Dict["asyncio.Future[TaskExecutionResult]", str] = {}
+        
+        try:
+            while pending or running:
+                ready = [
+                    name for name in pending
+                    if joins.is_ready(name) and name not in running.values()
+                ]
+                if not ready and not running:
+                    ready = list(pending)
+                
+                for task_name in ready:
+                    del pending[task_name]
+                    self._start_task(flow, state, task_name)
+                    running[asyncio.ensure_future(self._execute_task(task_name, state))] = task_name
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                
+                for future in [future for future in running if future in done]:
+                    task_name = running.pop(future)
+                    next_tasks = self._record_result(flow, state, future.result())
+                    joins.route(pending, next_tasks)
+                    joins.finish(task_name)
+                
+                await self._save_state(state)
+                
+                # Stop scheduling after a failure; tasks already running
+                # are allowed to finish
+                if state.status == FlowStatus.FAILED:
+                    pending.clear()
+        finally:
+            for future in running:
+                future.cancel()
+    
+    @staticmethod
+    def _start_task(flow: Flow, state: FlowExecutionState, task_name: str) -> str:
+        """Check that a task exists and mark it as the current task"""
+        if not flow.get_task(task_name):
+            raise ValueError(f"Task '{task_name}' not found in flow")
+        
+        state.current_task = task_name
+        logger.info("Executing task: %s", task_name)
+        return task_name
+    
+    @staticmethod
+    def _record_result(
+        flow: Flow,
+        state: FlowExecutionState,
+        task_result: TaskExecutionResult
+    ) -> Tuple[str, ...]:
+        """Add a task result to the history and return the tasks it routes to"""
+        state.add_task_result(task_result)
+        
+        # Evaluate conditions to determine next tasks
+        next_tasks = ConditionEvaluator.evaluate_all(task_result, flow)
+        
+        logger.info("Next tasks after '%s': %s", task_result.task_name, ", ".join(next_tasks) or "end")
+        
+        # If task failed and its branch ends, mark flow as failed
+        if task_result.status == TaskStatus.FAILURE and not next_tasks:
+            if state.status != FlowStatus.FAILED:
+                state.status = FlowStatus.FAILED
+                state.error_message = task_result.message
+        
+        return next_tasks
+    
+    async def _execute_task(
         self,
         task_name: str,
         state: FlowExecutionState
@@ -278,22 +444,23 @@ class FlowOrchestrator:
         """
         try:
             # Get task executor from registry
-            executor = task_registry.get_executor(task_name)
+            executor = get_executor(task_name)
             
             # Prepare context for task
             context = {
                 "execution_id": state.execution_id,
                 "flow_id": state.flow_id,
-                "execution_history": state.execution_history
+                "execution_history": state.execution_history,
+                "results_by_name": state.results_by_name
             }
             
             # Execute task
-            result = executor.execute(context)
+            result = await executor.execute(context)
             
             return result
             
         except Exception as e:
-            logger.error(f"Error executing task '{task_name}': {str(e)}")
+            logger.error("Error executing task '%s': %s", task_name, e)
             return TaskExecutionResult(
                 task_name=task_name,
                 status=TaskStatus.FAILURE,
@@ -301,6 +468,18 @@ class FlowOrchestrator:
                 data=None
             )
     
-    def get_execution_state(self, execution_id: str) -> Optional[FlowExecutionState]:
+    async def _save_state(self, state: FlowExecutionState) -> None:
+        """
+        Persist the execution state.
+        
+        Store failures are logged rather than raised so that a broken or
+        unreachable backend does not abort a running flow.
+        """
+        try:
+            await self.store.put(state.execution_id, state)
+        except Exception as e:
+            logger.error("Error saving state of execution '%s': %s", state.execution_id, e)
+    
+    async def get_execution_state(self, execution_id: str) -> Optional[FlowExecutionState]:
         """Get the state of a flow execution"""
-        return self.executions.get(execution_id)
+        return await self.store.get(execution_id)
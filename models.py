@@ -1,10 +1,14 @@
 """
 Data models for Flow Manager system.
 Defines the structure for Flow, Task, Condition, and execution state.
+
+The dataclasses are serialized directly by orjson; attributes prefixed
+with an underscore are internal indexes and are skipped in the output.
+All models use __slots__ (Python 3.10+); Task and Condition are frozen.
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Set, Tuple
 from datetime import datetime
 from enum import Enum
 
@@ -25,20 +29,14 @@ class FlowStatus(Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Task:
     """Represents a task in the flow"""
     name: str
     description: str
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "name": self.name,
-            "description": self.description
-        }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Condition:
     """Represents a condition that evaluates task results"""
     name: str
@@ -47,19 +45,96 @@ class Condition:
     outcome: str  # "success" or "failure"
     target_task_success: str
     target_task_failure: str
+
+
+@dataclass(slots=True, frozen=True)
+class JoinGraph:
+    """
+    Routing graph of a fan-out flow, condensed into strongly connected
+    components so that loops (e.g. retries) count as a single unit.
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "name": self.name,
-            "description": self.description,
-            "source_task": self.source_task,
-            "outcome": self.outcome,
-            "target_task_success": self.target_task_success,
-            "target_task_failure": self.target_task_failure
-        }
+    A task waits for its predecessors in other components; routes inside a
+    component never make a task wait, otherwise a retry loop would wait on
+    itself.
+    """
+    component: Dict[str, int]
+    members: List[Tuple[str, ...]]
+    predecessors: Dict[str, Tuple[str, ...]]
+    successors: Dict[str, Tuple[str, ...]]
+    
+    @classmethod
+    def build(
+        cls,
+        tasks: List[Task],
+        next_map: Dict[Tuple[str, str], Tuple[Tuple[str, str], ...]]
+    ) -> "JoinGraph":
+        """Condense the routing table with Tarjan's algorithm, O(tasks + routes)"""
+        routes: Dict[str, Dict[str, None]] = {task.name: {} for task in tasks}
+        for (source, _), matches in next_map.items():
+            for _, target in matches:
+                if target != "end":
+                    routes[source][target] = None
+        
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        component: Dict[str, int] = {}
+        members: List[Tuple[str, ...]] = []
+        for root in routes:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work: List[Tuple[str, Iterator[str]]] = [(root, iter(routes[root]))]
+            while work:
+                node, children = work[-1]
+                descended = False
+                for child in children:
+                    if child not in index:
+                        index[child] = low[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(routes[child])))
+                        descended = True
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                if descended:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    group: List[str] = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component[member] = len(members)
+                        group.append(member)
+                        if member == node:
+                            break
+                    members.append(tuple(group))
+        
+        predecessors: Dict[str, List[str]] = {}
+        successors: Dict[str, List[str]] = {}
+        for source, targets in routes.items():
+            for target in targets:
+                if component[source] != component[target]:
+                    predecessors.setdefault(target, []).append(source)
+                    successors.setdefault(source, []).append(target)
+        
+        return cls(
+            component=component,
+            members=members,
+            predecessors={name: tuple(names) for name, names in predecessors.items()},
+            successors={name: tuple(names) for name, names in successors.items()}
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class Flow:
     """Represents a complete flow definition"""
     id: str
@@ -67,29 +142,73 @@ class Flow:
     start_task: str
     tasks: List[Task]
     conditions: List[Condition]
+    fan_out: bool = False
+    _tasks_by_name: Dict[str, Task] = field(init=False, repr=False, compare=False)
+    _conditions_by_source: Dict[str, List[Condition]] = field(init=False, repr=False, compare=False)
+    _next_map: Dict[Tuple[str, str], Tuple[Tuple[str, str], ...]] = field(init=False, repr=False, compare=False)
+    _joins: Optional["JoinGraph"] = field(init=False, repr=False, compare=False)
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "id": self.id,
-            "name": self.name,
-            "start_task": self.start_task,
-            "tasks": [task.to_dict() for task in self.tasks],
-            "conditions": [condition.to_dict() for condition in self.conditions]
-        }
+    def __post_init__(self) -> None:
+        """Build lookup indexes so per-step task/condition lookups are O(1)"""
+        self._tasks_by_name = {task.name: task for task in self.tasks}
+        self._conditions_by_source = {}
+        for condition in self.conditions:
+            self._conditions_by_source.setdefault(condition.source_task, []).append(condition)
+        
+        # Routing table: (source_task, result status) -> (condition name,
+        # next task) pairs, in condition order. Conditions whose outcome
+        # matches the status take precedence; a failed task with only
+        # "success" conditions follows their failure targets. The first
+        # matching condition wins unless the flow sets fan_out, in which case
+        # every target runs as a branch.
+        routes: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        for condition in self.conditions:
+            if condition.outcome == "success":
+                target = condition.target_task_success
+            else:
+                target = condition.target_task_failure
+            routes.setdefault((condition.source_task, condition.outcome), []).append((condition.name, target))
+        fallback: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        for condition in self.conditions:
+            if condition.outcome == "success":
+                fallback.setdefault((condition.source_task, "failure"), []).append(
+                    (condition.name, condition.target_task_failure)
+                )
+        for key, matches in fallback.items():
+            routes.setdefault(key, matches)
+        self._next_map = {}
+        for key, matches in routes.items():
+            if not self.fan_out:
+                self._next_map[key] = (matches[0],)
+                continue
+            by_target: Dict[str, Tuple[str, str]] = {}
+            for match in matches:
+                by_target.setdefault(match[1], match)
+            self._next_map[key] = tuple(by_target.values())
+        
+        # Join bookkeeping is only needed when branches run concurrently
+        self._joins = JoinGraph.build(self.tasks, self._next_map) if self.fan_out else None
+    
+    @property
+    def next_map(self) -> Dict[Tuple[str, str], Tuple[Tuple[str, str], ...]]:
+        """(condition name, next task) pairs for each (source_task, task status value) pair"""
+        return self._next_map
+    
+    @property
+    def joins(self) -> Optional["JoinGraph"]:
+        """Join metadata for fan-out flows, None otherwise"""
+        return self._joins
     
     def get_task(self, task_name: str) -> Optional[Task]:
         """Get task by name"""
-        for task in self.tasks:
-            if task.name == task_name:
-                return task
-        return None
+        return self._tasks_by_name.get(task_name)
     
-    def get_conditions_for_task(self, task_name: str) -> List[Condition]:
+    def get_conditions_for_task(self, task_name: str) -> Sequence[Condition]:
         """Get all conditions for a specific source task"""
-        return [c for c in self.conditions if c.source_task == task_name]
+        return self._conditions_by_source.get(task_name, ())
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskExecutionResult:
     """Result of a task execution"""
     task_name: str
@@ -98,17 +217,19 @@ class TaskExecutionResult:
     message: str = ""
     timestamp: datetime = field(default_factory=datetime.now)
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "task_name": self.task_name,
-            "status": self.status.value,
-            "data": self.data,
-            "message": self.message,
-            "timestamp": self.timestamp.isoformat()
-        }
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TaskExecutionResult":
+        """Rebuild a result from its serialized form"""
+        return cls(
+            task_name=data["task_name"],
+            status=TaskStatus(data["status"]),
+            data=data.get("data"),
+            message=data.get("message", ""),
+            timestamp=datetime.fromisoformat(data["timestamp"])
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class FlowExecutionState:
     """Tracks the state of a flow execution"""
     execution_id: str
@@ -119,19 +240,71 @@ class FlowExecutionState:
     start_time: datetime = field(default_factory=datetime.now)
     end_time: Optional[datetime] = None
     error_message: Optional[str] = None
+    _results_by_name: Dict[str, TaskExecutionResult] = field(init=False, repr=False, compare=False)
+    _history_rows: List[Dict[str, Any]] = field(init=False, repr=False, compare=False)
     
-    def add_task_result(self, result: TaskExecutionResult):
-        """Add a task execution result to history"""
-        self.execution_history.append(result)
+    def __post_init__(self) -> None:
+        """Build the history indexes from any results passed in"""
+        self._results_by_name = {result.task_name: result for result in self.execution_history}
+        self._history_rows = [self._history_row(result) for result in self.execution_history]
     
-    def to_dict(self) -> Dict[str, Any]:
+    @property
+    def results_by_name(self) -> Dict[str, TaskExecutionResult]:
+        """Latest execution result for each task, keyed by task name"""
+        return self._results_by_name
+    
+    @property
+    def history_rows(self) -> List[Dict[str, Any]]:
+        """
+        Execution history as ready-to-encode dictionaries.
+        
+        Rows are built once when a result is recorded, with the status and
+        timestamp already converted to their JSON representations.
+        """
+        return self._history_rows
+    
+    def envelope(self) -> Dict[str, Any]:
+        """Every field except the execution history"""
         return {
             "execution_id": self.execution_id,
             "flow_id": self.flow_id,
-            "status": self.status.value,
+            "status": self.status,
             "current_task": self.current_task,
-            "execution_history": [r.to_dict() for r in self.execution_history],
-            "start_time": self.start_time.isoformat(),
-            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
             "error_message": self.error_message
         }
+    
+    def add_task_result(self, result: TaskExecutionResult) -> None:
+        """Add a task execution result to history"""
+        self.execution_history.append(result)
+        self._results_by_name[result.task_name] = result
+        self._history_rows.append(self._history_row(result))
+    
+    @staticmethod
+    def _history_row(result: TaskExecutionResult) -> Dict[str, Any]:
+        """Encode-ready form of a result, as serialized in execution_history"""
+        return {
+            "task_name": result.task_name,
+            "status": result.status.value,
+            "data": result.data,
+            "message": result.message,
+            "timestamp": result.timestamp.isoformat()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FlowExecutionState":
+        """Rebuild an execution state from its serialized form"""
+        end_time = data.get("end_time")
+        return cls(
+            execution_id=data["execution_id"],
+            flow_id=data["flow_id"],
+            status=FlowStatus(data["status"]),
+            current_task=data.get("current_task"),
+            execution_history=[
+                TaskExecutionResult.from_dict(result) for result in data.get("execution_history", [])
+            ],
+            start_time=datetime.fromisoformat(data["start_time"]),
+            end_time=datetime.fromisoformat(end_time) if end_time else None,
+            error_message=data.get("error_message")
+        )
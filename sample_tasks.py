@@ -3,8 +3,7 @@ Sample task implementations for demonstration.
 These tasks simulate the example flow: Fetch -> Process -> Store data.
 """
 
-import time
-import random
+import asyncio
 from typing import Dict, Any
 from task_executor import TaskExecutor, register_task
 from models import TaskExecutionResult, TaskStatus
@@ -17,14 +16,16 @@ logger = logging.getLogger(__name__)
 class FetchDataTask(TaskExecutor):
     """Task 1: Fetch data from a simulated data source"""
     
-    def execute(self, context: Dict[str, Any]) -> TaskExecutionResult:
+    async def execute(self, context: Dict[str, Any]) -> TaskExecutionResult:
         logger.info("Executing FetchDataTask...")
         
         try:
             # Simulate fetching data with some delay
-            time.sleep(0.5)
+            await asyncio.sleep(0.5)
             
             # Simulate occasional failures (10% chance)
+            import random
+            
             if random.random() < 0.1:
                 return TaskExecutionResult(
                     task_name="task1",
@@ -44,7 +45,7 @@ class FetchDataTask(TaskExecutor):
                 "source": "sample_database"
             }
             
-            logger.info(f"Successfully fetched {fetched_data['count']} records")
+            logger.info("Successfully fetched %s records", fetched_data["count"])
             
             return TaskExecutionResult(
                 task_name="task1",
@@ -54,7 +55,7 @@ class FetchDataTask(TaskExecutor):
             )
             
         except Exception as e:
-            logger.error(f"Error in FetchDataTask: {str(e)}")
+            logger.error("Error in FetchDataTask: %s", e)
             return TaskExecutionResult(
                 task_name="task1",
                 status=TaskStatus.FAILURE,
@@ -67,18 +68,12 @@ class FetchDataTask(TaskExecutor):
 class ProcessDataTask(TaskExecutor):
     """Task 2: Process the fetched data"""
     
-    def execute(self, context: Dict[str, Any]) -> TaskExecutionResult:
+    async def execute(self, context: Dict[str, Any]) -> TaskExecutionResult:
         logger.info("Executing ProcessDataTask...")
         
         try:
             # Get data from previous task (task1)
-            previous_results = context.get("execution_history", [])
-            task1_result = None
-            
-            for result in previous_results:
-                if result.task_name == "task1":
-                    task1_result = result
-                    break
+            task1_result = context["results_by_name"].get("task1")
             
             if not task1_result or task1_result.status != TaskStatus.SUCCESS:
                 return TaskExecutionResult(
@@ -89,7 +84,7 @@ class ProcessDataTask(TaskExecutor):
                 )
             
             # Process the data
-            time.sleep(0.5)
+            await asyncio.sleep(0.5)
             
             raw_data = task1_result.data
             records = raw_data.get("records", [])
@@ -108,7 +103,7 @@ class ProcessDataTask(TaskExecutor):
                 ]
             }
             
-            logger.info(f"Processed {len(records)} records, total: {total_value}, avg: {avg_value}")
+            logger.info("Processed %s records, total: %s, avg: %s", len(records), total_value, avg_value)
             
             return TaskExecutionResult(
                 task_name="task2",
@@ -118,7 +113,7 @@ class ProcessDataTask(TaskExecutor):
             )
             
         except Exception as e:
-            logger.error(f"Error in ProcessDataTask: {str(e)}")
+            logger.error("Error in ProcessDataTask: %s", e)
             return TaskExecutionResult(
                 task_name="task2",
                 status=TaskStatus.FAILURE,
@@ -131,18 +126,12 @@ class ProcessDataTask(TaskExecutor):
 class StoreDataTask(TaskExecutor):
     """Task 3: Store the processed data"""
     
-    def execute(self, context: Dict[str, Any]) -> TaskExecutionResult:
+    async def execute(self, context: Dict[str, Any]) -> TaskExecutionResult:
         logger.info("Executing StoreDataTask...")
         
         try:
             # Get data from previous task (task2)
-            previous_results = context.get("execution_history", [])
-            task2_result = None
-            
-            for result in previous_results:
-                if result.task_name == "task2":
-                    task2_result = result
-                    break
+            task2_result = context["results_by_name"].get("task2")
             
             if not task2_result or task2_result.status != TaskStatus.SUCCESS:
                 return TaskExecutionResult(
@@ -153,10 +142,12 @@ class StoreDataTask(TaskExecutor):
                 )
             
             # Simulate storing data
-            time.sleep(0.5)
+            await asyncio.sleep(0.5)
             
             processed_data = task2_result.data
             
+            import time
+            
             # In a real system, this would write to a database
             storage_result = {
                 "stored": True,
@@ -165,7 +156,7 @@ class StoreDataTask(TaskExecutor):
                 "storage_id": f"STORE_{int(time.time())}"
             }
             
-            logger.info(f"Data stored successfully at {storage_result['location']}")
+            logger.info("Data stored successfully at %s", storage_result["location"])
             
             return TaskExecutionResult(
                 task_name="task3",
@@ -175,7 +166,7 @@ class StoreDataTask(TaskExecutor):
             )
             
         except Exception as e:
-            logger.error(f"Error in StoreDataTask: {str(e)}")
+            logger.error("Error in StoreDataTask: %s", e)
             return TaskExecutionResult(
                 task_name="task3",
                 status=TaskStatus.FAILURE,
@@ -0,0 +1,26 @@
+"""
+JSON serialization shared by the REST API and the state stores.
+Uses orjson with one set of options so every encoded document agrees.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any
+
+import orjson
+
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_DATACLASS
+
+
+def json_default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object (including model dataclasses) as JSON bytes"""
+    return orjson.dumps(obj, default=json_default, option=JSON_OPTIONS)
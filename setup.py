@@ -0,0 +1,26 @@
+"""
+Optional ahead-of-time compilation of the flow engine with mypyc.
+
+    pip install mypy
+    python setup.py build_ext --inplace
+
+This builds flow_engine and models as C extensions next to the sources;
+Python imports the compiled modules in preference to the .py files.
+Delete the generated .so files to go back to the pure Python modules.
+
+The importers need no try/except fallback. Extension file names carry the
+interpreter's ABI tag (e.g. models.cpython-311-x86_64-linux-gnu.so), so
+another interpreter does not see a mismatched build and imports the .py
+file instead. Where both exist they behave the same: the parser
+checks input types itself rather than relying on annotations that the
+compiled code enforces.
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="flow_manager",
+    py_modules=[],
+    ext_modules=mypycify(["--ignore-missing-imports", "flow_engine.py", "models.py"])
+)
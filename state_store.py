@@ -0,0 +1,92 @@
+"""
+State stores for Flow Manager executions.
+Keeps FlowExecutionState objects either in process memory or in Redis so
+that every worker process can answer status queries.
+
+Stores are called from the event loop, so their methods are coroutines and
+backends must use non-blocking clients.
+"""
+
+from typing import Dict, Optional, Protocol
+
+import orjson
+
+from models import FlowExecutionState
+from serialization import dumps
+
+
+class StateStore(Protocol):
+    """Interface for persisting flow execution states"""
+    
+    async def get(self, execution_id: str) -> Optional[FlowExecutionState]:
+        """Get the state of an execution, or None if unknown"""
+        ...
+    
+    async def put(self, execution_id: str, state: FlowExecutionState) -> None:
+        """Save the current state of an execution (may raise on backend errors)"""
+        ...
+
+
+class InMemoryStateStore:
+    """Stores execution states in a per-process dictionary"""
+    
+    def __init__(self) -> None:
+        self._states: Dict[str, FlowExecutionState] = {}
+    
+    async def get(self, execution_id: str) -> Optional[FlowExecutionState]:
+        return self._states.get(execution_id)
+    
+    async def put(self, execution_id: str, state: FlowExecutionState) -> None:
+        self._states[execution_id] = state
+
+
+class RedisStateStore:
+    """
+    Stores execution states in Redis using the asyncio client.
+    
+    Each execution is kept as an orjson-encoded envelope (every field but the
+    history) plus a Redis list with one entry per history row. put() only
+    appends the rows added since the previous put, so each row is written
+    once rather than with every save.
+    """
+    
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        ttl: int = 3600,
+        key_prefix: str = "flow_execution:"
+    ):
+        import redis.asyncio as redis
+        
+        self._redis = redis.Redis.from_url(url)
+        self._ttl = ttl
+        self._key_prefix = key_prefix
+        # History rows already stored for executions that are still running
+        self._rows_written: Dict[str, int] = {}
+    
+    async def get(self, execution_id: str) -> Optional[FlowExecutionState]:
+        key = self._key_prefix + execution_id
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.get(key)
+            pipe.lrange(key + ":history", 0, -1)
+            raw, rows = await pipe.execute()
+        if raw is None:
+            return None
+        data = orjson.loads(raw)
+        data["execution_history"] = [orjson.loads(row) for row in rows]
+        return FlowExecutionState.from_dict(data)
+    
+    async def put(self, execution_id: str, state: FlowExecutionState) -> None:
+        key = self._key_prefix + execution_id
+        written = self._rows_written.get(execution_id, 0)
+        rows = state.history_rows[written:]
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(key, dumps(state.envelope()), ex=self._ttl)
+            if rows:
+                pipe.rpush(key + ":history", *[dumps(row) for row in rows])
+            pipe.expire(key + ":history", self._ttl)
+            await pipe.execute()
+        if state.end_time is None:
+            self._rows_written[execution_id] = written + len(rows)
+        else:
+            self._rows_written.pop(execution_id, None)
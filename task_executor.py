@@ -6,19 +6,38 @@ Provides base classes and registry for task implementations.
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Type
 from models import TaskExecutionResult, TaskStatus
+import importlib
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Modules whose tasks are registered on first use
+BUILTIN_TASK_MODULES = ("sample_tasks",)
+
+# Entry point group scanned for task modules provided by installed packages
+TASK_ENTRY_POINT_GROUP = "flow_manager.tasks"
+
+_builtin_tasks_loaded = False
+_builtin_tasks_lock = threading.Lock()
+
 
 class TaskExecutor(ABC):
-    """Abstract base class for all task executors"""
+    """
+    Abstract base class for all task executors.
+    
+    The registry shares a single instance per task across executions, so
+    executors must be stateless (any per-run data belongs in the context).
+    """
     
     @abstractmethod
-    def execute(self, context: Dict[str, Any]) -> TaskExecutionResult:
+    async def execute(self, context: Dict[str, Any]) -> TaskExecutionResult:
         """
         Execute the task with given context.
         
+        Implementations are coroutines so that I/O waits yield to the event
+        loop instead of blocking a worker thread.
+        
         Args:
             context: Dictionary containing data from previous tasks and flow state
             
@@ -35,65 +54,93 @@ class TaskExecutor(ABC):
         return class_name.lower()
 
 
-class TaskRegistry:
-    """Registry for managing task executor implementations"""
+# Registered task classes and their shared executor instances
+_TASKS: Dict[str, Type[TaskExecutor]] = {}
+_INSTANCES: Dict[str, TaskExecutor] = {}
+
+
+def register(task_name: str, task_class: Type[TaskExecutor]):
+    """
+    Register a task executor class.
     
-    _instance = None
-    _tasks: Dict[str, Type[TaskExecutor]] = {}
+    Args:
+        task_name: Name to identify the task
+        task_class: TaskExecutor subclass
+    """
+    if not issubclass(task_class, TaskExecutor):
+        raise ValueError(f"{task_class} must inherit from TaskExecutor")
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(TaskRegistry, cls).__new__(cls)
-            cls._instance._tasks = {}
-        return cls._instance
+    _TASKS[task_name] = task_class
+    _INSTANCES.pop(task_name, None)
+    logger.info("Registered task: %s", task_name)
+
+
+def get_executor(task_name: str) -> TaskExecutor:
+    """
+    Get the shared instance of a task executor.
     
-    def register(self, task_name: str, task_class: Type[TaskExecutor]):
-        """
-        Register a task executor class.
+    One instance is created per registered task and reused across
+    executions, so executors must not keep per-run mutable state.
+    
+    Args:
+        task_name: Name of the task
         
-        Args:
-            task_name: Name to identify the task
-            task_class: TaskExecutor subclass
-        """
-        if not issubclass(task_class, TaskExecutor):
-            raise ValueError(f"{task_class} must inherit from TaskExecutor")
+    Returns:
+        Instance of the task executor
         
-        self._tasks[task_name] = task_class
-        logger.info(f"Registered task: {task_name}")
+    Raises:
+        KeyError: If task not found in registry
+    """
+    executor = _INSTANCES.get(task_name)
+    if executor is not None:
+        return executor
+    
+    if task_name not in _TASKS:
+        register_builtin_tasks()
+    
+    if task_name not in _TASKS:
+        raise KeyError(f"Task '{task_name}' not found in registry. Available tasks: {list(_TASKS.keys())}")
+    
+    executor = _INSTANCES[task_name] = _TASKS[task_name]()
+    return executor
+
+
+def is_registered(task_name: str) -> bool:
+    """Check if a task is registered"""
+    return task_name in _TASKS
+
+
+def get_all_tasks() -> Dict[str, Type[TaskExecutor]]:
+    """Get all registered tasks"""
+    return _TASKS.copy()
+
+
+def clear():
+    """Clear all registered tasks (mainly for testing)"""
+    _TASKS.clear()
+    _INSTANCES.clear()
+
+
+class TaskRegistry:
+    """Backward-compatible object wrapper around the module-level registry"""
+    
+    def register(self, task_name: str, task_class: Type[TaskExecutor]):
+        register(task_name, task_class)
     
     def get_executor(self, task_name: str) -> TaskExecutor:
-        """
-        Get an instance of a task executor.
-        
-        Args:
-            task_name: Name of the task
-            
-        Returns:
-            Instance of the task executor
-            
-        Raises:
-            KeyError: If task not found in registry
-        """
-        if task_name not in self._tasks:
-            raise KeyError(f"Task '{task_name}' not found in registry. Available tasks: {list(self._tasks.keys())}")
-        
-        task_class = self._tasks[task_name]
-        return task_class()
+        return get_executor(task_name)
     
     def is_registered(self, task_name: str) -> bool:
-        """Check if a task is registered"""
-        return task_name in self._tasks
+        return is_registered(task_name)
     
     def get_all_tasks(self) -> Dict[str, Type[TaskExecutor]]:
-        """Get all registered tasks"""
-        return self._tasks.copy()
+        return get_all_tasks()
     
     def clear(self):
-        """Clear all registered tasks (mainly for testing)"""
-        self._tasks.clear()
+        clear()
 
 
-# Global registry instance
+# Global registry instance (kept for backward compatibility)
 task_registry = TaskRegistry()
 
 
@@ -104,10 +151,44 @@ def register_task(task_name: str):
     Usage:
         @register_task("task1")
         class MyTask(TaskExecutor):
-            def execute(self, context):
+            async def execute(self, context):
                 ...
     """
     def decorator(task_class: Type[TaskExecutor]):
-        task_registry.register(task_name, task_class)
+        register(task_name, task_class)
         return task_class
     return decorator
+
+
+def register_builtin_tasks():
+    """
+    Import the built-in task modules and any task plugins.
+    
+    Task modules register themselves via @register_task when imported, so
+    this is deferred until a task is first requested instead of happening
+    at application import time. Plugins are discovered through the
+    'flow_manager.tasks' entry point group. Safe to call more than once and
+    from several threads; callers return only once loading has finished.
+    If a built-in module fails to import, the error propagates and the next
+    call retries.
+    """
+    global _builtin_tasks_loaded
+    if _builtin_tasks_loaded:
+        return
+    
+    with _builtin_tasks_lock:
+        if _builtin_tasks_loaded:
+            return
+        
+        for module_name in BUILTIN_TASK_MODULES:
+            importlib.import_module(module_name)
+        
+        from importlib.metadata import entry_points
+        
+        for entry_point in entry_points(group=TASK_ENTRY_POINT_GROUP):
+            try:
+                entry_point.load()
+            except Exception as e:
+                logger.error("Failed to load task plugin '%s': %s", entry_point.name, e)
+        
+        _builtin_tasks_loaded = True
@@ -0,0 +1,89 @@
+"""
+Tests for the Quart REST API.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import orjson
+
+from app import _stream_state, app
+from models import FlowExecutionState, FlowStatus, TaskExecutionResult, TaskStatus
+from serialization import dumps
+from task_executor import TaskExecutor, register_task
+
+
+@register_task("api_sleep")
+class SleepTask(TaskExecutor):
+    """Waits without blocking the event loop"""
+    
+    async def execute(self, context):
+        await asyncio.sleep(0.3)
+        return TaskExecutionResult(task_name="api_sleep", status=TaskStatus.SUCCESS)
+
+
+SLEEP_FLOW = orjson.dumps({
+    "flow": {
+        "id": "api_sleep_flow",
+        "name": "Sleep flow",
+        "start_task": "api_sleep",
+        "tasks": [{"name": "api_sleep"}],
+        "conditions": []
+    }
+})
+
+
+def test_concurrent_executions_interleave():
+    async def run():
+        client = app.test_client()
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/flow/execute", data=SLEEP_FLOW) for _ in range(5)
+        ])
+        return time.perf_counter() - start, responses
+    
+    elapsed, responses = asyncio.run(run())
+    
+    assert [r.status_code for r in responses] == [200] * 5
+    # Serialized requests would take 5 x 0.3s
+    assert elapsed < 1.0
+
+
+def test_validate_rejects_non_object_body():
+    async def run():
+        return await app.test_client().post("/flow/validate", data=b"[1]")
+    
+    response = asyncio.run(run())
+    
+    assert response.status_code == 400
+
+
+def test_streamed_state_is_a_snapshot():
+    state = FlowExecutionState(execution_id="e1", flow_id="f1", status=FlowStatus.RUNNING)
+    response = _stream_state(state)
+    
+    # The orchestrator keeps updating the state after the view has returned
+    state.add_task_result(TaskExecutionResult(task_name="t", status=TaskStatus.SUCCESS))
+    state.status = FlowStatus.COMPLETED
+    state.end_time = datetime.now()
+    body = orjson.loads(asyncio.run(response.get_data()))
+    
+    assert body["status"] == "running"
+    assert body["execution_history"] == []
+    assert body["end_time"] is None
+
+
+def test_streamed_state_matches_serialized_state():
+    result = TaskExecutionResult(task_name="t", status=TaskStatus.SUCCESS, data={"n": 1})
+    state = FlowExecutionState(
+        execution_id="e1",
+        flow_id="f1",
+        status=FlowStatus.COMPLETED,
+        execution_history=[result]
+    )
+    
+    body = asyncio.run(_stream_state(state).get_data())
+    
+    assert body == dumps(state)
+    assert state.results_by_name == {"t": result}
@@ -0,0 +1,196 @@
+"""
+Tests for flow parsing, routing and orchestration.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from flow_engine import FlowOrchestrator, FlowParser
+from models import FlowStatus, TaskExecutionResult, TaskStatus
+from task_executor import TaskExecutor, register
+
+
+def make_flow(**overrides):
+    flow = {
+        "id": "flow1",
+        "name": "Test flow",
+        "start_task": "a",
+        "tasks": [{"name": "a"}],
+        "conditions": []
+    }
+    flow.update(overrides)
+    return flow
+
+
+def test_parse_fills_defaults():
+    flow = FlowParser.parse({"flow": make_flow()})
+    
+    assert flow.id == "flow1"
+    assert flow.tasks[0].description == ""
+    assert flow.conditions == []
+
+
+@pytest.mark.parametrize("flow_id", [1, "", None])
+def test_parse_requires_non_empty_string_id(flow_id):
+    with pytest.raises(ValueError):
+        FlowParser.parse(make_flow(id=flow_id))
+
+
+def make_task(name, delay=0.0, outcomes=(TaskStatus.SUCCESS,)):
+    """Register a task that sleeps and then returns the next of its outcomes"""
+    calls = []
+    
+    class _Task(TaskExecutor):
+        async def execute(self, context):
+            status = outcomes[min(len(calls), len(outcomes) - 1)]
+            calls.append(time.perf_counter())
+            await asyncio.sleep(delay)
+            return TaskExecutionResult(task_name=name, status=status)
+    
+    register(name, _Task)
+    return name
+
+
+def edge(source, target, failure="end", name=None):
+    return {
+        "name": name or f"{source}_to_{target}",
+        "source_task": source,
+        "target_task_success": target,
+        "target_task_failure": failure
+    }
+
+
+def run_flow(flow_json):
+    flow = FlowParser.parse(flow_json)
+    return asyncio.run(FlowOrchestrator().execute_flow(flow))
+
+
+def history(state):
+    return [result.task_name for result in state.execution_history]
+
+
+def test_join_waits_for_branches_of_different_lengths():
+    a, b, c, d, e = (make_task(f"join_{n}", delay=0.05) for n in "abcde")
+    state = run_flow(make_flow(
+        start_task=a,
+        fan_out=True,
+        tasks=[{"name": n} for n in (a, b, c, d, e)],
+        conditions=[edge(a, b), edge(a, c), edge(b, d), edge(c, e), edge(e, d)]
+    ))
+    
+    assert state.status == FlowStatus.COMPLETED
+    assert history(state) == [a, b, c, e, d]
+
+
+def test_join_does_not_wait_for_branch_not_taken():
+    a, b, c, d = (make_task(f"skip_{n}") for n in "abcd")
+    state = run_flow(make_flow(
+        start_task=a,
+        fan_out=True,
+        tasks=[{"name": n} for n in (a, b, c, d)],
+        conditions=[
+            edge(a, b),
+            {"name": "a_failed", "source_task": a, "outcome": "failure",
+             "target_task_success": "end", "target_task_failure": c},
+            edge(b, d),
+            edge(c, d)
+        ]
+    ))
+    
+    assert state.status == FlowStatus.COMPLETED
+    assert history(state) == [a, b, d]
+
+
+def test_fan_out_retry_loop_before_join():
+    a, b, d = (make_task(f"loop_{n}") for n in "abd")
+    flaky = make_task("loop_flaky", outcomes=(TaskStatus.FAILURE, TaskStatus.FAILURE, TaskStatus.SUCCESS))
+    state = run_flow(make_flow(
+        start_task=a,
+        fan_out=True,
+        tasks=[{"name": n} for n in (a, b, flaky, d)],
+        conditions=[edge(a, b), edge(a, flaky), edge(b, d), edge(flaky, d, failure=flaky)]
+    ))
+    
+    assert state.status == FlowStatus.COMPLETED
+    assert history(state) == [a, b, flaky, flaky, flaky, d]
+
+
+def test_sequential_flow_has_no_join_metadata():
+    flow = FlowParser.parse(make_flow(
+        tasks=[{"name": "a"}, {"name": "b"}],
+        conditions=[edge("a", "b")]
+    ))
+    
+    assert flow.joins is None
+
+
+def test_fan_out_branches_run_concurrently():
+    a, b, c = (make_task(f"fan_{n}", delay=0.2) for n in "abc")
+    start = time.perf_counter()
+    state = run_flow(make_flow(
+        start_task=a,
+        fan_out=True,
+        tasks=[{"name": n} for n in (a, b, c)],
+        conditions=[edge(a, b), edge(a, c)]
+    ))
+    
+    assert state.status == FlowStatus.COMPLETED
+    assert sorted(history(state)[1:]) == [b, c]
+    assert time.perf_counter() - start < 0.55
+
+
+def test_first_matching_condition_wins_without_fan_out():
+    a, b, c = (make_task(f"first_{n}") for n in "abc")
+    state = run_flow(make_flow(
+        start_task=a,
+        tasks=[{"name": n} for n in (a, b, c)],
+        conditions=[edge(a, b), edge(a, c)]
+    ))
+    
+    assert history(state) == [a, b]
+
+
+def test_retry_loop():
+    flaky = make_task("retry_flaky", outcomes=(TaskStatus.FAILURE, TaskStatus.SUCCESS))
+    done = make_task("retry_done")
+    state = run_flow(make_flow(
+        start_task=flaky,
+        tasks=[{"name": flaky}, {"name": done}],
+        conditions=[edge(flaky, done, failure=flaky)]
+    ))
+    
+    assert state.status == FlowStatus.COMPLETED
+    assert history(state) == [flaky, flaky, done]
+
+
+def test_failed_branch_fails_flow():
+    a = make_task("fail_a", outcomes=(TaskStatus.FAILURE,))
+    b = make_task("fail_b")
+    state = run_flow(make_flow(
+        start_task=a,
+        tasks=[{"name": a}, {"name": b}],
+        conditions=[edge(a, b)]
+    ))
+    
+    assert state.status == FlowStatus.FAILED
+    assert history(state) == [a]
+
+
+def test_routing_logs_condition_name(caplog):
+    a, b = (make_task(f"log_{n}") for n in "ab")
+    with caplog.at_level("INFO", logger="flow_engine"):
+        run_flow(make_flow(
+            start_task=a,
+            tasks=[{"name": a}, {"name": b}],
+            conditions=[edge(a, b, name="check_a")]
+        ))
+    
+    assert f"Condition 'check_a' matched (success): next task = '{b}'" in caplog.messages
+
+
+@pytest.mark.parametrize("flow_json", [[1], "flow", None])
+def test_parse_rejects_non_object(flow_json):
+    with pytest.raises(ValueError):
+        FlowParser.parse(flow_json)
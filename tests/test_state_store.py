@@ -0,0 +1,81 @@
+"""
+Tests for execution state persistence.
+"""
+
+import asyncio
+
+import orjson
+import pytest
+
+from flow_engine import FlowOrchestrator, FlowParser
+from models import FlowExecutionState, FlowStatus, TaskExecutionResult, TaskStatus
+from serialization import dumps
+from state_store import InMemoryStateStore, RedisStateStore
+from task_executor import TaskExecutor, register_task
+
+
+@register_task("store_int_keys")
+class IntKeyTask(TaskExecutor):
+    """Returns data with non-string dictionary keys"""
+    
+    async def execute(self, context):
+        return TaskExecutionResult(
+            task_name="store_int_keys",
+            status=TaskStatus.SUCCESS,
+            data={1: "x"}
+        )
+
+
+class FailingStore(InMemoryStateStore):
+    """Store whose writes always fail"""
+    
+    async def put(self, execution_id, state):
+        raise ConnectionError("store unavailable")
+
+
+FLOW = FlowParser.parse({
+    "id": "store_flow",
+    "name": "Store flow",
+    "start_task": "store_int_keys",
+    "tasks": [{"name": "store_int_keys"}]
+})
+
+
+def test_state_with_non_string_keys_round_trips():
+    state = FlowExecutionState(execution_id="e1", flow_id="f1", status=FlowStatus.COMPLETED)
+    state.add_task_result(
+        TaskExecutionResult(task_name="t", status=TaskStatus.SUCCESS, data={1: "x"})
+    )
+    
+    restored = FlowExecutionState.from_dict(orjson.loads(dumps(state)))
+    
+    assert restored.status == FlowStatus.COMPLETED
+    assert restored.results_by_name["t"].data == {"1": "x"}
+
+
+def test_store_errors_do_not_abort_execution():
+    orchestrator = FlowOrchestrator(store=FailingStore())
+    
+    state = asyncio.run(orchestrator.execute_flow(FLOW))
+    
+    assert state.status == FlowStatus.COMPLETED
+    assert [r.task_name for r in state.execution_history] == ["store_int_keys"]
+
+
+def test_redis_store_appends_history_rows():
+    fakeredis = pytest.importorskip("fakeredis")
+    
+    async def run():
+        store = RedisStateStore()
+        store._redis = fakeredis.FakeAsyncRedis()
+        state = FlowExecutionState(execution_id="e1", flow_id="f1", status=FlowStatus.RUNNING)
+        for name in ("a", "b"):
+            state.add_task_result(TaskExecutionResult(task_name=name, status=TaskStatus.SUCCESS))
+            await store.put("e1", state)
+        history_length = await store._redis.llen("flow_execution:e1:history")
+        return history_length, await store.get("e1")
+    
+    history_length, restored = asyncio.run(run())
+    
+    assert history_length == 2
+    assert [r.task_name for r in restored.execution_history] == ["a", "b"]
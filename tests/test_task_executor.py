@@ -0,0 +1,59 @@
+"""
+Tests for the task registry.
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+import task_executor
+
+
+@pytest.fixture
+def slow_builtin_module(tmp_path, monkeypatch):
+    """A built-in task module whose import is slow, loaded from scratch"""
+    (tmp_path / "slow_builtin_tasks.py").write_text(
+        "import time\n"
+        "from task_executor import TaskExecutor, register_task\n"
+        "time.sleep(0.2)\n"
+        "@register_task('slow_builtin')\n"
+        "class SlowBuiltinTask(TaskExecutor):\n"
+        "    async def execute(self, context):\n"
+        "        return None\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(task_executor, "BUILTIN_TASK_MODULES", ("slow_builtin_tasks",))
+    monkeypatch.setattr(task_executor, "_builtin_tasks_loaded", False)
+    yield
+    sys.modules.pop("slow_builtin_tasks", None)
+
+
+def test_concurrent_first_lookups_wait_for_registration(slow_builtin_module):
+    errors = []
+    
+    def lookup():
+        try:
+            task_executor.get_executor("slow_builtin")
+        except KeyError as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=lookup) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+
+
+def test_failed_builtin_import_is_retried(monkeypatch):
+    monkeypatch.setattr(task_executor, "BUILTIN_TASK_MODULES", ("missing_builtin_tasks",))
+    monkeypatch.setattr(task_executor, "_builtin_tasks_loaded", False)
+    
+    with pytest.raises(ImportError):
+        task_executor.register_builtin_tasks()
+    
+    assert task_executor._builtin_tasks_loaded is False